@@ -0,0 +1,154 @@
+"""
+Numerical kernels for the earthquake pattern analysis
+Compiled with Numba when it is installed; plain NumPy implementations are used otherwise
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Fast-math flags without 'nnan'/'ninf' so that NaN checks on missing depths survive compilation
+SAFE_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+# Explicit signatures make Numba compile (or load from its on-disk cache) at import time, so the
+# first prediction does not pay for compilation; callers must pass contiguous arrays of these dtypes
+INTERVAL_STATS_SIG = 'Tuple((f8, f8, f8, f8, f8, b1[::1]))(f8[::1], f8, f8)'
+EVENT_STATS_SIG = 'Tuple((f8, f8, f8, f8, f8, f8, f8, i8, i8))(f4[::1], f4[::1], i2[::1], i8)'
+CLASSIFY_ZONES_SIG = 'void(f8[::1], f8[::1], i1[::1])'
+
+def _interval_stats(diffs, q_lo, q_hi):
+    """Filter outlier intervals (IQR rule) and return (avg, median, std, lower, upper, kept_mask)."""
+    n = diffs.shape[0]
+    kept = np.empty(n, dtype=np.bool_)
+    if n > 3:
+        # Use IQR method with reasonable bounds for earthquake intervals
+        iqr = q_hi - q_lo
+        lower_bound = max(30.0, q_lo - 1.5 * iqr)  # Minimum 30 days
+        upper_bound = min(7300.0, q_hi + 1.5 * iqr)  # Maximum 20 years
+        np.logical_and(diffs >= lower_bound, diffs <= upper_bound, kept)
+
+        # Fall back to original method if too many outliers removed
+        if kept.sum() < max(3.0, n * 0.5):
+            lower_bound, upper_bound = 30.0, 3650.0
+            np.logical_and(diffs >= lower_bound, diffs <= upper_bound, kept)
+    else:
+        lower_bound, upper_bound = 30.0, 3650.0
+        np.logical_and(diffs >= lower_bound, diffs <= upper_bound, kept)
+
+    filtered = diffs[kept]
+    k = filtered.shape[0]
+    if k < 3:
+        return np.nan, np.nan, np.nan, lower_bound, upper_bound, kept
+
+    avg = filtered.mean()
+    std = np.sqrt(((filtered - avg) ** 2).sum() / (k - 1))
+    return avg, np.median(filtered), std, lower_bound, upper_bound, kept
+
+def _event_stats_loop(mags, depths, years, trend_start):
+    """Single pass over time-sorted events returning magnitude and depth statistics.
+
+    Returns (avg_mag, max_mag, min_mag, mag_std, magnitude_trend, avg_depth, depth_std,
+    shallow_count, deep_count). The trend is the mean of the per-year average magnitudes
+    from position trend_start on, or avg_mag when fewer than 3 events fall in that window.
+    """
+    n = mags.shape[0]
+
+    # Welford running moments keep the variance accurate in a single pass
+    mag_mean = 0.0
+    mag_m2 = 0.0
+    mag_min = np.inf
+    mag_max = -np.inf
+    depth_n = 0
+    depth_mean = 0.0
+    depth_m2 = 0.0
+    shallow = 0
+    deep = 0
+
+    # Years are sorted, so each year's events form one contiguous run
+    trend_sum = 0.0
+    trend_years = 0
+    year_sum = 0.0
+    year_n = 0
+
+    for i in range(n):
+        m = np.float64(mags[i])
+        delta = m - mag_mean
+        mag_mean += delta / (i + 1)
+        mag_m2 += delta * (m - mag_mean)
+        if m < mag_min:
+            mag_min = m
+        if m > mag_max:
+            mag_max = m
+
+        d = np.float64(depths[i])
+        if d == d:  # skip missing depths
+            depth_n += 1
+            delta = d - depth_mean
+            depth_mean += delta / depth_n
+            depth_m2 += delta * (d - depth_mean)
+            if d < 70:
+                shallow += 1
+            else:
+                deep += 1
+
+        if i >= trend_start:
+            year_sum += m
+            year_n += 1
+            if i == n - 1 or years[i + 1] != years[i]:
+                trend_sum += year_sum / year_n
+                trend_years += 1
+                year_sum = 0.0
+                year_n = 0
+
+    mag_std = np.sqrt(mag_m2 / (n - 1)) if n > 1 else np.nan
+    avg_depth = depth_mean if depth_n > 0 else np.nan
+    depth_std = np.sqrt(depth_m2 / (depth_n - 1)) if depth_n > 1 else np.nan
+    magnitude_trend = trend_sum / trend_years if n - trend_start >= 3 else mag_mean
+    return mag_mean, mag_max, mag_min, mag_std, magnitude_trend, avg_depth, depth_std, shallow, deep
+
+def _event_stats_numpy(mags, depths, years, trend_start):
+    """Vectorized equivalent of _event_stats_loop for environments without Numba."""
+    mags = mags.astype(np.float64)
+    avg_magnitude = mags.mean()
+    magnitude_std = mags.std(ddof=1) if len(mags) > 1 else np.nan
+
+    if len(mags) - trend_start >= 3:
+        _, year_index = np.unique(years[trend_start:], return_inverse=True)
+        yearly_means = np.bincount(year_index, weights=mags[trend_start:]) / np.bincount(year_index)
+        magnitude_trend = yearly_means.mean()
+    else:
+        magnitude_trend = avg_magnitude
+
+    depths = depths[~np.isnan(depths)].astype(np.float64)
+    avg_depth = depths.mean() if len(depths) > 0 else np.nan
+    depth_std = depths.std(ddof=1) if len(depths) > 1 else np.nan
+    shallow = int(np.count_nonzero(depths < 70))
+
+    return (avg_magnitude, mags.max(), mags.min(), magnitude_std, magnitude_trend,
+            avg_depth, depth_std, shallow, len(depths) - shallow)
+
+if NUMBA_AVAILABLE:
+    _interval_stats = njit(INTERVAL_STATS_SIG, cache=True, fastmath=True, boundscheck=False)(_interval_stats)
+    _event_stats = njit(EVENT_STATS_SIG, cache=True, fastmath=SAFE_FASTMATH, boundscheck=False)(_event_stats_loop)
+
+    @njit(CLASSIFY_ZONES_SIG, cache=True, fastmath=True, boundscheck=False)
+    def _classify_zones_nb(lats, lons, out):
+        """Write ZONE_NAMES codes for each coordinate pair into out."""
+        for i in range(lats.shape[0]):
+            lat = lats[i]
+            lon = lons[i]
+            if -60 <= lat <= 70 and (110 <= lon <= 180 or -180 <= lon <= -100):
+                out[i] = 1
+            elif 20 <= lat <= 50 and -10 <= lon <= 160:
+                out[i] = 2
+            elif -40 <= lon <= -10 and -60 <= lat <= 70:
+                out[i] = 3
+            else:
+                out[i] = 0
+else:
+    _event_stats = _event_stats_numpy
+    _classify_zones_nb = None
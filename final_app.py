@@ -12,6 +12,29 @@ import warnings
 import os
 import requests
 import json
+from collections import namedtuple
+import importlib.util
+import threading
+from statistics import NormalDist
+
+from _core import NUMBA_AVAILABLE, _classify_zones_nb, _event_stats, _interval_stats
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# scikit-learn is only needed to train the optional ML model, so it is imported on first use
+SKLEARN_AVAILABLE = importlib.util.find_spec('sklearn') is not None
 
 warnings.filterwarnings('ignore')
 
@@ -35,13 +58,176 @@ COUNTRY_COORDS = {
     'Afghanistan': {'lat_range': (29, 39), 'lon_range': (60, 75), 'name': 'Afghanistan'}
 }
 
+# Country bounding boxes as column arrays (one entry per COUNTRY_COORDS key) for vectorized lookups
+COUNTRY_NAMES = list(COUNTRY_COORDS)
+COUNTRY_LAT_LO, COUNTRY_LAT_HI, COUNTRY_LON_LO, COUNTRY_LON_HI = np.array(
+    [coords['lat_range'] + coords['lon_range'] for coords in COUNTRY_COORDS.values()],
+    dtype=np.float32
+).T
+
+# Sidebar description of each country, formatted once at import instead of on every rerun
+COUNTRY_SIDEBAR_INFO = {
+    country: f"""
+    **Selected**: {info['name']}
+    
+    **Coordinates**:
+    - Lat: {info['lat_range'][0]}° to {info['lat_range'][1]}°
+    - Lon: {info['lon_range'][0]}° to {info['lon_range'][1]}°
+    """
+    for country, info in COUNTRY_COORDS.items()
+}
+
+# English month names indexed by month number - 1 (independent of the process locale)
+MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December')
+
+# Season of each calendar month (index 0 unused): Dec-Feb winter, Mar-May spring, etc.
+SEASONS = ('winter', 'spring', 'summer', 'autumn')
+SEASON_OF_MONTH = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0])
+
+# Lightweight record for a single earthquake shown in the recent-activity summary
+EarthquakeEvent = namedtuple('EarthquakeEvent', ['time', 'magnitude', 'place'])
+
+# Per-country struct of arrays: the global row positions plus contiguous, compact
+# copies of the columns the pattern analysis reads, all sorted by time, and the
+# positions of the significant (M4.0+) events within them
+CountryArrays = namedtuple('CountryArrays', ['rows', 'time_ns', 'magnitude', 'depth', 'year', 'month', 'significant'])
+
+NS_PER_DAY = 86_400 * 10**9
+
+# USGS FDSN event service queried for live earthquake data
+USGS_QUERY_URL = "https://earthquake.usgs.gov/fdsnws/event/1/query"
+
+# Where train_model persists the trained model
+MODEL_PATH = 'data/final_model.pkl'
+
+# Catalogue columns the app uses; any other CSV columns are dropped at load time
+KEEP_COLUMNS = ['time', 'latitude', 'longitude', 'depth', 'magnitude', 'place', 'zone']
+
+# Columns the per-country analysis works on; text columns are kept aside
+NUMERIC_COLUMNS = ['time', 'latitude', 'longitude', 'depth', 'magnitude', 'year', 'month']
+
+# Process-wide random generator for the stochastic parts of a prediction
+_rng = np.random.default_rng()
+
+# Zone labels indexed by the integer codes produced by the compiled zone classifier
+ZONE_NAMES = np.array(['global_zone', 'pacific_ring_zone', 'mediterranean_himalayan_zone', 'atlantic_ridge_zone'])
+
+def _quartiles(values):
+    """Return (Q1, Q3) with linear interpolation, using a single O(n) np.partition."""
+    n = len(values)
+    positions = np.array([0.25, 0.75]) * (n - 1)
+    lo = np.floor(positions).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    part = np.partition(values, np.concatenate((lo, hi)))
+    return part[lo] + (part[hi] - part[lo]) * (positions - lo)
+
+# Compact column dtypes: coordinates and magnitudes need only ~6 significant digits
+COMPACT_DTYPES = {
+    'latitude': 'float32', 'longitude': 'float32', 'depth': 'float32', 'magnitude': 'float32',
+    'year': 'int16', 'month': 'int8'
+}
+
+def _compact_dtypes(data):
+    """Downcast numeric columns and store low-cardinality text columns as categories."""
+    dtypes = {
+        col: dtype for col, dtype in COMPACT_DTYPES.items()
+        if col in data and not (dtype.startswith('int') and data[col].hasnans)
+    }
+    data = data.astype(dtypes)
+    
+    if 'zone' in data:
+        data['zone'] = data['zone'].astype('category')
+    if 'place' in data and data['place'].nunique() <= len(data) // 2:
+        data['place'] = data['place'].astype('category')
+    return data
+
+@st.cache_resource(show_spinner=False)
+def _load_historical_earthquakes(data_path, csv_mtime):
+    """Load the historical catalogue once per process, preferring a Parquet copy of the CSV.
+    
+    The returned frame is shared by every session and must be treated as read-only.
+    """
+    parquet_path = os.path.splitext(data_path)[0] + '.parquet'
+    if PYARROW_AVAILABLE and os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= csv_mtime:
+        # A copy written by an older version may hold extra columns or wider dtypes,
+        # so read only the kept columns and compact them again; without the derived
+        # columns the copy is stale and rebuilt from the CSV below
+        cached_columns = set(pq.read_schema(parquet_path).names)
+        if {'year', 'month'} <= cached_columns:
+            columns = [col for col in KEEP_COLUMNS + ['year', 'month'] if col in cached_columns]
+            return _compact_dtypes(pd.read_parquet(parquet_path, columns=columns))
+    
+    # Parse floats straight into their compact dtype instead of downcasting float64 later
+    float_columns = [col for col, dtype in COMPACT_DTYPES.items() if dtype == 'float32']
+    if PYARROW_AVAILABLE:
+        # Multi-threaded parse that also converts ISO timestamps to datetime64 directly
+        column_types = {col: pa.float32() for col in float_columns}
+        table = pacsv.read_csv(data_path, convert_options=pacsv.ConvertOptions(column_types=column_types))
+        table = table.select([col for col in table.column_names if col in KEEP_COLUMNS])
+        data = table.to_pandas(coerce_temporal_nanoseconds=True)
+    else:
+        data = pd.read_csv(
+            data_path,
+            usecols=lambda col: col in KEEP_COLUMNS,
+            dtype={col: 'float32' for col in float_columns},
+            parse_dates=['time']
+        )
+    if not pd.api.types.is_datetime64_any_dtype(data['time']):
+        data['time'] = pd.to_datetime(data['time'])
+    data['year'] = data['time'].dt.year
+    data['month'] = data['time'].dt.month
+    data = _compact_dtypes(data).sort_values('time', ignore_index=True)
+    
+    try:
+        data.to_parquet(parquet_path, engine='pyarrow', compression='zstd')
+    except Exception:
+        # Parquet support is optional; without it the CSV is simply parsed again next run
+        pass
+    return data
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_usgs_geojson(start, end, minmag):
+    """Download the raw USGS GeoJSON feed for a date window; repeated windows are served from cache."""
+    params = {
+        'format': 'geojson',
+        'starttime': start,
+        'endtime': end,
+        'minmagnitude': minmag,
+        'orderby': 'time-asc'
+    }
+    response = requests.get(USGS_QUERY_URL, params=params, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+# Each new data version or day adds a key per country, so keep about two generations
+@st.cache_data(show_spinner=False, max_entries=2 * len(COUNTRY_COORDS))
+def _analyze_country(country, data_version, today, _predictor, _now):
+    """Memoize a country's pattern analysis across reruns and sessions.
+    
+    Only the country, the predictor's data version and the calendar day form the cache
+    key; the predictor and the exact timestamp are passed through unhashed.
+    """
+    country_arrays = _predictor.get_country_arrays(country)
+    if country_arrays is None:
+        return None
+    return _predictor._analyze_earthquake_patterns(country_arrays, _now)
+
 class EarthquakeFuturePredictor:
     """Advanced future earthquake prediction system using historical pattern analysis."""
     
     def __init__(self):
         self.data = None
         self.country_data = {}
-        self.predictions_cache = {}
+        self._country_cache = {}
+        
+        # The predictor is shared by every session, so refreshes are serialised
+        self._refresh_lock = threading.Lock()
+        
+        # Optional ML magnitude model (see train_model / train_simple_model)
+        self.model = None
+        self.scaler = None
+        self.is_trained = False
         
     def load_data(self):
         """Load and process earthquake data with live updates."""
@@ -51,53 +237,117 @@ class EarthquakeFuturePredictor:
                 st.error(f"Dataset not found at {data_path}")
                 return False
                 
-            # Load historical data
-            self.data = pd.read_csv(data_path)
-            self.data['time'] = pd.to_datetime(self.data['time'])
-            self.data['year'] = self.data['time'].dt.year
-            self.data['month'] = self.data['time'].dt.month
+            # Load historical data (parsed once and shared across sessions)
+            self.data = _load_historical_earthquakes(data_path, os.path.getmtime(data_path))
             
             # Get the latest date in historical data
-            latest_historical = self.data['time'].max()
+            self.latest_historical = self.data['time'].max()
+            self.historical_count = len(self.data)
             
-            # Fetch recent earthquake data from USGS
-            recent_data = self._fetch_recent_earthquakes(latest_historical)
+            # Fetch recent earthquake data from USGS. This runs inside st.cache_resource,
+            # which would replay any message emitted here on every cache hit, so the
+            # fetch messages are kept and shown by show_load_status() instead
+            self.load_messages = []
+            recent_data = self._fetch_recent_earthquakes(self.latest_historical, self.load_messages)
             
             if recent_data is not None and len(recent_data) > 0:
-                # Combine historical and recent data
-                self.data = pd.concat([self.data, recent_data], ignore_index=True)
-                self.data = self.data.sort_values('time').drop_duplicates()
-                
-                st.success(f"✅ Loaded {len(self.data):,} earthquake records (Historical + Recent Live Data)")
-                st.info(f"📊 Historical data: up to {latest_historical.strftime('%Y-%m-%d')}")
-                st.info(f"🔄 Live data: {len(recent_data)} recent earthquakes added")
-                
-                # Display data freshness
-                most_recent = self.data['time'].max()
-                data_age_days = (datetime.now() - most_recent).days
-                if data_age_days == 0:
-                    st.success("🟢 Data is current (updated today)")
-                elif data_age_days <= 7:
-                    st.info(f"🟡 Data is {data_age_days} days old")
-                else:
-                    st.warning(f"🟠 Data is {data_age_days} days old")
-            else:
-                st.success(f"✅ Loaded {len(self.data):,} historical earthquake records (1800-2024)")
-                st.warning("⚠️ Could not fetch recent live data - using historical data only")
-                
-                # Show historical data age
-                most_recent = self.data['time'].max()
-                data_age_days = (datetime.now() - most_recent).days
-                st.warning(f"🔴 Historical data is {data_age_days} days old")
+                # Combine historical and recent data; both are sorted by time and the
+                # recent rows are all newer than the historical ones, so appending keeps order
+                self.data = _compact_dtypes(pd.concat([self.data, recent_data], ignore_index=True))
                 
+            self._index_columns()
             return True
             
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
             return False
     
-    def _fetch_recent_earthquakes(self, last_date):
-        """Fetch recent earthquake data from USGS API."""
+    def show_load_status(self, now):
+        """Report what load_data found, measured against the current catalogue and time."""
+        for level, message in self.load_messages:
+            getattr(st, level)(message)
+        
+        live_count = len(self.data) - self.historical_count
+        data_age_days = (now - self.data['time'].max()).days
+        if live_count > 0:
+            st.success(f"✅ Loaded {self.total_records_str} earthquake records (Historical + Recent Live Data)")
+            st.info(f"📊 Historical data: up to {self.latest_historical.strftime('%Y-%m-%d')}")
+            st.info(f"🔄 Live data: {live_count} recent earthquakes added")
+            
+            # Display data freshness
+            if data_age_days == 0:
+                st.success("🟢 Data is current (updated today)")
+            elif data_age_days <= 7:
+                st.info(f"🟡 Data is {data_age_days} days old")
+            else:
+                st.warning(f"🟠 Data is {data_age_days} days old")
+        else:
+            st.success(f"✅ Loaded {self.total_records_str} historical earthquake records (1800-2024)")
+            st.warning("⚠️ Could not fetch recent live data - using historical data only")
+            
+            # Show historical data age
+            st.warning(f"🔴 Historical data is {data_age_days} days old")
+    
+    def refresh_live_data(self, messages):
+        """Append USGS earthquakes newer than the loaded data, keeping the historical catalogue."""
+        with self._refresh_lock:
+            recent_data = self._fetch_recent_earthquakes(self.data['time'].max(), messages)
+            if recent_data is None:
+                return 0
+            
+            # Another session may have appended some of these rows in the meantime
+            recent_data = recent_data[recent_data['time'] > self.data['time'].max()]
+            if len(recent_data) == 0:
+                return 0
+            
+            self.data = _compact_dtypes(pd.concat([self.data, recent_data], ignore_index=True))
+            self._index_columns()
+            return len(recent_data)
+    
+    def _index_columns(self):
+        """Precompute the row positions of every country in the time-sorted data."""
+        # Place names are looked up by row position when the summary needs them; the
+        # column's own array keeps a categorical place column as codes plus categories
+        self._place = self.data['place'].array if 'place' in self.data else None
+        
+        self._time_ns = self.data['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        
+        # One broadcast comparison against every bounding box at once gives a
+        # (countries, rows) membership matrix; boxes overlap (e.g. Pakistan/Afghanistan),
+        # so each country keeps its own rows, already in time order
+        lats = self.data['latitude'].to_numpy()[None, :]
+        lons = self.data['longitude'].to_numpy()[None, :]
+        in_box = (
+            (lats >= COUNTRY_LAT_LO[:, None]) & (lats <= COUNTRY_LAT_HI[:, None]) &
+            (lons >= COUNTRY_LON_LO[:, None]) & (lons <= COUNTRY_LON_HI[:, None])
+        )
+        self._country_rows = {country: np.flatnonzero(in_box[k]) for k, country in enumerate(COUNTRY_NAMES)}
+        self._country_arrays = {country: self._gather_arrays(rows) for country, rows in self._country_rows.items()}
+        
+        # Record count as shown in the sidebar, formatted once per (re)load
+        self.total_records_str = f"{len(self.data):,}"
+        
+        # Identifies this state of the catalogue in cached per-country results
+        self.data_version = (len(self._time_ns), int(self._time_ns[-1]) if len(self._time_ns) > 0 else 0)
+        
+        # Country slices taken from the previous frame are no longer valid
+        self._country_cache = {}
+    
+    def _gather_arrays(self, rows):
+        """Copy the analysed columns of the given rows into contiguous compact arrays."""
+        magnitude = self.data['magnitude'].to_numpy(dtype=np.float32)[rows]
+        return CountryArrays(
+            rows=rows,
+            time_ns=self._time_ns[rows],
+            magnitude=magnitude,
+            depth=self.data['depth'].to_numpy(dtype=np.float32)[rows],
+            year=self.data['year'].to_numpy(dtype=np.int16)[rows],
+            month=self.data['month'].to_numpy(dtype=np.int8)[rows],
+            significant=np.flatnonzero(magnitude >= 4.0)
+        )
+    
+    def _fetch_recent_earthquakes(self, last_date, messages):
+        """Fetch recent earthquake data from USGS API, appending (level, text) status messages."""
         try:
             # Calculate date range for recent data (last 30 days + any gap from historical data)
             current_date = datetime.now()
@@ -105,111 +355,121 @@ class EarthquakeFuturePredictor:
             # If historical data is very old, get data from last 2 years
             if (current_date - last_date).days > 60:
                 start_date = current_date - timedelta(days=730)  # Last 2 years
-                st.info(f"🔄 Historical data is from {last_date.strftime('%Y-%m-%d')}. Fetching recent data from {start_date.strftime('%Y-%m-%d')}...")
+                messages.append(('info', f"🔄 Historical data is from {last_date.strftime('%Y-%m-%d')}. Fetching recent data from {start_date.strftime('%Y-%m-%d')}..."))
             else:
-                start_date = last_date + timedelta(days=1)  # Start from day after last historical record
+                start_date = last_date  # Start from the day of the last record; older rows are filtered below
             
-            # USGS Earthquake API endpoint for recent earthquakes
-            end_date_str = current_date.strftime('%Y-%m-%d')
+            # USGS Earthquake API date window for recent earthquakes
+            end_date_str = (current_date + timedelta(days=1)).strftime('%Y-%m-%d')  # Include today
             start_date_str = start_date.strftime('%Y-%m-%d')
             
-            # Use USGS API for significant earthquakes (magnitude 4.0+)
-            url = f"https://earthquake.usgs.gov/fdsnws/event/1/query"
-            params = {
-                'format': 'geojson',
-                'starttime': start_date_str,
-                'endtime': end_date_str,
-                'minmagnitude': 3.0,  # Get magnitude 3.0+ to match historical data
-                'orderby': 'time'
-            }
+            # Get magnitude 3.0+ to match historical data
+            raw = _fetch_usgs_geojson(start_date_str, end_date_str, 3.0)
+            data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+            earthquakes = data.get('features', [])
             
-            with st.spinner(f"🌐 Fetching recent earthquake data from USGS ({start_date_str} to {end_date_str})..."):
-                response = requests.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                earthquakes = data.get('features', [])
-                
-                if not earthquakes:
-                    st.info("ℹ️ No recent earthquakes found in USGS database")
-                    return None
-                
-                # Convert to DataFrame format matching our historical data
-                recent_records = []
-                for eq in earthquakes:
-                    props = eq['properties']
-                    coords = eq['geometry']['coordinates']
-                    
-                    # Convert timestamp to datetime
-                    eq_time = datetime.fromtimestamp(props['time'] / 1000)
-                    
-                    # Determine zone based on location (simplified)
-                    zone = self._determine_earthquake_zone(coords[1], coords[0])
-                    
-                    record = {
-                        'time': eq_time,
-                        'latitude': coords[1],
-                        'longitude': coords[0],
-                        'depth': coords[2] if coords[2] is not None else 10.0,
-                        'magnitude': props['mag'],
-                        'place': props.get('place', 'Unknown location'),
-                        'zone': zone,
-                        'year': eq_time.year,
-                        'month': eq_time.month
-                    }
-                    recent_records.append(record)
-                
-                recent_df = pd.DataFrame(recent_records)
-                
-                # Filter out any records that might overlap with historical data
-                recent_df = recent_df[recent_df['time'] > last_date]
-                
-                st.success(f"✅ Successfully fetched {len(recent_df)} recent earthquakes from USGS")
-                return recent_df
+            if not earthquakes:
+                messages.append(('info', "ℹ️ No recent earthquakes found in USGS database"))
+                return None
+            
+            # Convert to DataFrame format matching our historical data,
+            # filling one array per column instead of one dict per earthquake
+            n = len(earthquakes)
+            lats = np.empty(n)
+            lons = np.empty(n)
+            depths = np.empty(n)
+            mags = np.empty(n)
+            places = [None] * n
+            for i, eq in enumerate(earthquakes):
+                props = eq['properties']
+                coords = eq['geometry']['coordinates']
                 
+                lons[i] = coords[0]
+                lats[i] = coords[1]
+                depths[i] = coords[2] if coords[2] is not None else 10.0
+                mags[i] = props['mag'] if props['mag'] is not None else np.nan
+                places[i] = props.get('place', 'Unknown location')
+            
+            # USGS timestamps are epoch milliseconds (UTC); parse them in one call
+            times_ms = np.fromiter((eq['properties']['time'] for eq in earthquakes), dtype=np.int64, count=n)
+            times = pd.to_datetime(times_ms, unit='ms')
+            
+            # Determine zone based on location (simplified)
+            zones = self._determine_earthquake_zones(lats, lons)
+            
+            recent_df = pd.DataFrame({
+                'time': times,
+                'latitude': lats,
+                'longitude': lons,
+                'depth': depths,
+                'magnitude': mags,
+                'place': places,
+                'zone': zones,
+                'year': times.year.values,
+                'month': times.month.values
+            })
+            
+            # Filter out any records that might overlap with historical data
+            recent_df = recent_df[recent_df['time'] > last_date]
+            if not recent_df['time'].is_monotonic_increasing:
+                recent_df = recent_df.sort_values('time')
+            recent_df = recent_df.reset_index(drop=True)
+            
+            messages.append(('success', f"✅ Successfully fetched {len(recent_df)} recent earthquakes from USGS"))
+            return recent_df
+            
         except requests.exceptions.RequestException as e:
-            st.warning(f"⚠️ Could not fetch live earthquake data: Network error - {str(e)}")
+            messages.append(('warning', f"⚠️ Could not fetch live earthquake data: Network error - {str(e)}"))
             return None
         except Exception as e:
-            st.warning(f"⚠️ Could not fetch live earthquake data: {str(e)}")
+            messages.append(('warning', f"⚠️ Could not fetch live earthquake data: {str(e)}"))
             return None
     
-    def _determine_earthquake_zone(self, lat, lon):
-        """Determine earthquake zone based on coordinates."""
+    def _determine_earthquake_zones(self, lats, lons):
+        """Determine earthquake zones for arrays of coordinates."""
+        if NUMBA_AVAILABLE:
+            codes = np.empty(len(lats), dtype=np.int8)
+            _classify_zones_nb(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64), codes)
+            return ZONE_NAMES[codes]
+        
         # Simplified zone classification based on major tectonic regions
         
         # Pacific Ring of Fire
-        if ((lat >= -60 and lat <= 70) and 
-            ((lon >= 110 and lon <= 180) or (lon >= -180 and lon <= -100))):
-            return 'pacific_ring_zone'
+        pacific = ((lats >= -60) & (lats <= 70)) & (((lons >= 110) & (lons <= 180)) | ((lons >= -180) & (lons <= -100)))
         
-        # Mediterranean-Himalayan belt  
-        elif ((lat >= 20 and lat <= 50) and (lon >= -10 and lon <= 160)):
-            return 'mediterranean_himalayan_zone'
+        # Mediterranean-Himalayan belt
+        mediterranean = ((lats >= 20) & (lats <= 50)) & ((lons >= -10) & (lons <= 160))
         
         # Mid-Atlantic Ridge
-        elif ((lon >= -40 and lon <= -10) and (lat >= -60 and lat <= 70)):
-            return 'atlantic_ridge_zone'
-            
-        # Global/Other zones
-        else:
-            return 'global_zone'
+        atlantic = ((lons >= -40) & (lons <= -10)) & ((lats >= -60) & (lats <= 70))
+        
+        # Earlier conditions take precedence; everything else is a global/other zone
+        return np.select(
+            [pacific, mediterranean, atlantic],
+            ['pacific_ring_zone', 'mediterranean_himalayan_zone', 'atlantic_ridge_zone'],
+            default='global_zone'
+        )
     
-    def get_recent_earthquake_summary(self, country):
+    def get_recent_earthquake_summary(self, country, now=None):
         """Get summary of recent earthquake activity for a country."""
         try:
-            country_data = self.filter_country_data(country)
-            if len(country_data) == 0:
+            country_arrays = self.get_country_arrays(country)
+            if country_arrays is None or len(country_arrays.rows) == 0:
                 return None
             
             # Get earthquakes from the last 365 days
-            current_date = datetime.now()
-            one_year_ago = current_date - timedelta(days=365)
-            
-            recent_earthquakes = country_data[country_data['time'] >= one_year_ago]
-            recent_significant = recent_earthquakes[recent_earthquakes['magnitude'] >= 4.0]
-            
-            if len(recent_earthquakes) == 0:
+            now_ns = pd.Timestamp(now or datetime.now()).value
+            one_year_ago_ns = now_ns - 365 * NS_PER_DAY
+            
+            # Country arrays are sorted by time, so the last year is a tail slice; the
+            # significant positions are sorted too, so they need one more binary search
+            times = country_arrays.time_ns
+            significant = country_arrays.significant
+            start = np.searchsorted(times, one_year_ago_ns)
+            total_recent = int(len(times) - start)
+            significant_recent = int(len(significant) - np.searchsorted(significant, start))
+            
+            if total_recent == 0:
                 return {
                     'total_recent': 0,
                     'significant_recent': 0,
@@ -220,26 +480,21 @@ class EarthquakeFuturePredictor:
                 }
             
             # Get the most recent earthquake
-            latest_earthquake = recent_earthquakes.iloc[-1]
-            days_since_latest = (current_date - latest_earthquake['time']).days
+            latest_earthquake = self._earthquake_event(country_arrays, len(times) - 1)
+            days_since_latest = int((now_ns - times[-1]) // NS_PER_DAY)
             
-            # Get the most recent significant earthquake (>=4.0)
+            # Get the most recent significant earthquake (>=4.0), looking back through
+            # all historical data when there was none in the last year
             latest_significant = None
             days_since_significant = None
             
-            if len(recent_significant) > 0:
-                latest_significant = recent_significant.iloc[-1]
-                days_since_significant = (current_date - latest_significant['time']).days
-            else:
-                # Look for significant earthquakes in all historical data
-                all_significant = country_data[country_data['magnitude'] >= 4.0]
-                if len(all_significant) > 0:
-                    latest_significant = all_significant.iloc[-1]
-                    days_since_significant = (current_date - latest_significant['time']).days
+            if len(significant) > 0:
+                latest_significant = self._earthquake_event(country_arrays, significant[-1])
+                days_since_significant = int((now_ns - times[significant[-1]]) // NS_PER_DAY)
             
             return {
-                'total_recent': len(recent_earthquakes),
-                'significant_recent': len(recent_significant),
+                'total_recent': total_recent,
+                'significant_recent': significant_recent,
                 'latest_earthquake': latest_earthquake,
                 'latest_significant': latest_significant,
                 'days_since_latest': days_since_latest,
@@ -250,137 +505,128 @@ class EarthquakeFuturePredictor:
             st.error(f"Error getting recent earthquake summary: {str(e)}")
             return None
             
+    def _earthquake_event(self, country_arrays, idx):
+        """Read one earthquake from the country arrays instead of boxing a whole row."""
+        place = self._place[country_arrays.rows[idx]] if self._place is not None else 'Unknown location'
+        return EarthquakeEvent(
+            time=pd.Timestamp(country_arrays.time_ns[idx]),
+            magnitude=country_arrays.magnitude[idx],
+            place=place
+        )
+            
     def filter_country_data(self, country):
         """Filter earthquake data for a specific country."""
         if country not in COUNTRY_COORDS:
             return pd.DataFrame()
-            
-        coords = COUNTRY_COORDS[country]
-        mask = (
-            (self.data['latitude'] >= coords['lat_range'][0]) &
-            (self.data['latitude'] <= coords['lat_range'][1]) &
-            (self.data['longitude'] >= coords['lon_range'][0]) &
-            (self.data['longitude'] <= coords['lon_range'][1])
-        )
         
-        country_data = self.data[mask].copy()
-        country_data = country_data.sort_values('time')
-        return country_data
+        if country not in self._country_cache:
+            # Built on first use; the app itself reads the precomputed country arrays
+            numeric = self.data[[col for col in NUMERIC_COLUMNS if col in self.data]]
+            self._country_cache[country] = numeric.take(self._country_rows[country])
+        return self._country_cache[country]
+    
+    def get_country_arrays(self, country):
+        """Return the precomputed CountryArrays for a country, or None if it is unknown."""
+        return self._country_arrays.get(country)
+        
+    def analyze_earthquake_patterns(self, country, now=None):
+        """Analyze a country's earthquake patterns, reusing the cached result for unchanged data."""
+        now = now or datetime.now()
+        return _analyze_country(country, self.data_version, now.date(), self, now)
         
-    def analyze_earthquake_patterns(self, country_data):
+    def _analyze_earthquake_patterns(self, country_arrays, now):
         """Analyze earthquake patterns to find cycles and trends with enhanced data refinement."""
-        if len(country_data) < 10:
+        if len(country_arrays.rows) < 10:
             return None
             
         # Enhanced filtering for significant earthquakes with multiple thresholds
-        # Primary analysis: magnitude >= 4.0 (generally felt earthquakes)
-        significant = country_data[country_data['magnitude'] >= 4.0].copy()
+        magnitudes = country_arrays.magnitude
+        
+        # Primary analysis: magnitude >= 4.0 (generally felt earthquakes), located at index time
+        significant = country_arrays.significant
+        significant_count = len(significant)
         
         # Secondary analysis: major earthquakes >= 5.0 for pattern validation
-        major = country_data[country_data['magnitude'] >= 5.0].copy()
+        major_count = np.count_nonzero(magnitudes >= 5.0)
         
-        if len(significant) < 5:
+        if significant_count < 5:
             return None
-            
-        # Data quality assessment
-        data_quality_score = self._assess_data_quality(significant)
         
-        # Calculate time intervals with improved outlier detection
-        significant = significant.sort_values('time')
-        time_diffs = significant['time'].diff().dt.days.dropna()
+        # Country arrays are already sorted by time
+        times = country_arrays.time_ns[significant]
+        mags = magnitudes[significant]
+        depths = country_arrays.depth[significant]
+        years = country_arrays.year[significant]
+        months = country_arrays.month[significant]
+        
+        # Calculate time intervals (whole days) with improved outlier detection
+        time_diffs = (np.diff(times) // NS_PER_DAY).astype(np.float64)
         
-        # Enhanced outlier removal using statistical methods
+        # Enhanced outlier removal using the IQR of the intervals
         if len(time_diffs) > 3:
-            # Calculate IQR for better outlier detection
-            Q1 = time_diffs.quantile(0.25)
-            Q3 = time_diffs.quantile(0.75)
-            IQR = Q3 - Q1
-            
-            # Use IQR method with reasonable bounds for earthquake intervals
-            lower_bound = max(30, Q1 - 1.5 * IQR)  # Minimum 30 days
-            upper_bound = min(7300, Q3 + 1.5 * IQR)  # Maximum 20 years
-            
-            time_diffs_filtered = time_diffs[(time_diffs >= lower_bound) & (time_diffs <= upper_bound)]
-            
-            # Fall back to original method if too many outliers removed
-            if len(time_diffs_filtered) < max(3, len(time_diffs) * 0.5):
-                time_diffs_filtered = time_diffs[(time_diffs >= 30) & (time_diffs <= 3650)]
+            Q1, Q3 = _quartiles(time_diffs)
         else:
-            time_diffs_filtered = time_diffs[(time_diffs >= 30) & (time_diffs <= 3650)]
+            Q1 = Q3 = np.nan
+        
+        # Statistical measures with robust estimators
+        avg_interval, median_interval, std_interval, _, _, kept = _interval_stats(time_diffs, Q1, Q3)
+        time_diffs_filtered = time_diffs[kept]
             
         if len(time_diffs_filtered) < 3:
             return None
-            
-        # Statistical measures with robust estimators
-        avg_interval = time_diffs_filtered.mean()
-        median_interval = time_diffs_filtered.median()
-        std_interval = time_diffs_filtered.std()
         
-        # Enhanced monthly and seasonal analysis
-        monthly_counts = significant['month'].value_counts().sort_index()
+        # Enhanced monthly and seasonal analysis (index 0 of month_totals is unused)
+        month_totals = np.bincount(months, minlength=13)
+        observed_months = np.flatnonzero(month_totals[1:]) + 1
+        monthly_counts = month_totals[observed_months]
         
         # Get peak months with statistical significance test
         monthly_mean = monthly_counts.mean()
-        monthly_std = monthly_counts.std()
+        monthly_std = monthly_counts.std(ddof=1) if len(monthly_counts) > 1 else np.nan
         # Peak months are those significantly above average
         peak_threshold = monthly_mean + (monthly_std * 0.5)
-        peak_months = monthly_counts[monthly_counts >= peak_threshold].index.tolist()
+        peak_months = observed_months[monthly_counts >= peak_threshold].tolist()
         
         # If no statistically significant peaks, use top 3
         if len(peak_months) == 0:
-            peak_months = monthly_counts.nlargest(3).index.tolist()
+            peak_months = observed_months[np.argsort(-monthly_counts, kind='stable')[:3]].tolist()
             
         # Seasonal patterns with confidence levels
-        seasonal_analysis = {
-            'winter': monthly_counts[[12, 1, 2]].sum(),
-            'spring': monthly_counts[[3, 4, 5]].sum(),  
-            'summer': monthly_counts[[6, 7, 8]].sum(),
-            'autumn': monthly_counts[[9, 10, 11]].sum()
-        }
+        season_totals = np.bincount(SEASON_OF_MONTH[1:], weights=month_totals[1:], minlength=len(SEASONS))
+        seasonal_analysis = dict(zip(SEASONS, season_totals.astype(np.int64).tolist()))
         peak_season = max(seasonal_analysis, key=seasonal_analysis.get)
         
         # Calculate seasonal confidence
         total_seasonal = sum(seasonal_analysis.values())
         seasonal_confidence = seasonal_analysis[peak_season] / total_seasonal if total_seasonal > 0 else 0.25
         
-        # Enhanced recent activity trend with multiple time windows
-        recent_data_5yr = significant[significant['year'] >= (datetime.now().year - 5)]
-        recent_data_10yr = significant[significant['year'] >= (datetime.now().year - 10)]
-        recent_data_20yr = significant[significant['year'] >= (datetime.now().year - 20)]
+        # Enhanced recent activity trend with multiple time windows; years are
+        # sorted, so each window is a tail slice found with a binary search
+        window_starts = np.searchsorted(years, now.year - np.array([5, 10, 20]), side='left')
+        recent_count_5yr, _, recent_count_20yr = len(years) - window_starts
         
-        recent_frequency = len(recent_data_20yr) / 20.0 if len(recent_data_20yr) > 0 else 0
-        recent_frequency_5yr = len(recent_data_5yr) / 5.0 if len(recent_data_5yr) > 0 else 0
+        recent_frequency = recent_count_20yr / 20.0
+        recent_frequency_5yr = recent_count_5yr / 5.0
         
-        # Enhanced magnitude analysis
-        avg_magnitude = significant['magnitude'].mean()
-        max_magnitude = significant['magnitude'].max()
-        min_magnitude = significant['magnitude'].min()
-        magnitude_std = significant['magnitude'].std()
+        # Magnitude, magnitude trend (last 10 years) and depth statistics in one pass
+        (avg_magnitude, max_magnitude, min_magnitude, magnitude_std, magnitude_trend,
+         avg_depth, depth_std, shallow_earthquakes, deep_earthquakes) = _event_stats(
+            mags, depths, years, window_starts[1])
         
-        # Magnitude trend analysis with multiple time windows
-        recent_years = significant[significant['year'] >= (datetime.now().year - 10)]
-        if len(recent_years) >= 3:
-            magnitude_trend = recent_years.groupby('year')['magnitude'].mean().mean()
-        else:
-            magnitude_trend = avg_magnitude
-            
-        # Enhanced depth analysis
-        avg_depth = significant['depth'].mean()
-        depth_std = significant['depth'].std()
-        shallow_earthquakes = len(significant[significant['depth'] < 70])
-        deep_earthquakes = len(significant[significant['depth'] >= 70])
+        # Data quality assessment, reusing the magnitude range from the fused pass
+        data_quality_score = self._assess_data_quality(times, max_magnitude - min_magnitude, pd.Timestamp(now).value)
         
         # Calculate pattern consistency metrics
         consistency_metrics = {
             'temporal_consistency': 1 - (std_interval / avg_interval) if std_interval > 0 else 0.8,
             'magnitude_consistency': 1 - (magnitude_std / avg_magnitude) if magnitude_std > 0 else 0.8,
-            'depth_consistency': max(shallow_earthquakes, deep_earthquakes) / len(significant),
+            'depth_consistency': max(shallow_earthquakes, deep_earthquakes) / significant_count,
             'seasonal_consistency': seasonal_confidence
         }
         
         return {
-            'total_earthquakes': len(significant),
-            'major_earthquakes': len(major),
+            'total_earthquakes': significant_count,
+            'major_earthquakes': major_count,
             'avg_interval_days': avg_interval,
             'median_interval_days': median_interval,
             'std_interval_days': std_interval,
@@ -388,7 +634,7 @@ class EarthquakeFuturePredictor:
             'peak_months': peak_months,
             'peak_season': peak_season,
             'seasonal_confidence': seasonal_confidence,
-            'monthly_distribution': monthly_counts.to_dict(),
+            'monthly_distribution': dict(zip(observed_months.tolist(), monthly_counts.tolist())),
             'seasonal_distribution': seasonal_analysis,
             'avg_magnitude': avg_magnitude,
             'max_magnitude': max_magnitude,
@@ -401,19 +647,24 @@ class EarthquakeFuturePredictor:
             'deep_count': deep_earthquakes,
             'recent_frequency': recent_frequency,
             'recent_frequency_5yr': recent_frequency_5yr,
-            'last_major_earthquake': significant.iloc[-1]['time'] if len(significant) > 0 else None,
+            'last_major_earthquake': pd.Timestamp(times[-1]),
             'time_intervals': time_diffs_filtered.tolist(),
             'consistency_metrics': consistency_metrics,
             'data_quality_score': data_quality_score
         }
         
-    def _assess_data_quality(self, earthquake_data):
-        """Assess the quality of earthquake data for prediction reliability."""
+    def _assess_data_quality(self, times_ns, mag_range, now_ns):
+        """Assess the quality of earthquake data for prediction reliability.
+        
+        ``times_ns`` must be sorted and, like ``now_ns``, in nanoseconds since the epoch;
+        ``mag_range`` is the spread of the events' magnitudes.
+        """
         quality_score = 0
+        event_count = len(times_ns)
         
         # Time span coverage (more years = better)
-        if len(earthquake_data) > 0:
-            time_span = (earthquake_data['time'].max() - earthquake_data['time'].min()).days / 365.25
+        if event_count > 0:
+            time_span = ((times_ns[-1] - times_ns[0]) // NS_PER_DAY) / 365.25
             if time_span >= 50:
                 quality_score += 25
             elif time_span >= 20:
@@ -424,7 +675,6 @@ class EarthquakeFuturePredictor:
                 quality_score += 10
                 
         # Data completeness (number of events)
-        event_count = len(earthquake_data)
         if event_count >= 100:
             quality_score += 25
         elif event_count >= 50:
@@ -435,9 +685,8 @@ class EarthquakeFuturePredictor:
             quality_score += 10
             
         # Data recency (how recent is the latest data)
-        if len(earthquake_data) > 0:
-            latest_date = earthquake_data['time'].max()
-            days_since_latest = (datetime.now() - latest_date).days
+        if event_count > 0:
+            days_since_latest = (now_ns - times_ns[-1]) // NS_PER_DAY
             if days_since_latest <= 365:  # Within 1 year
                 quality_score += 25
             elif days_since_latest <= 1825:  # Within 5 years
@@ -448,8 +697,7 @@ class EarthquakeFuturePredictor:
                 quality_score += 5
                 
         # Magnitude range coverage (diverse magnitudes = better understanding)
-        if len(earthquake_data) > 0:
-            mag_range = earthquake_data['magnitude'].max() - earthquake_data['magnitude'].min()
+        if event_count > 0:
             if mag_range >= 3.0:
                 quality_score += 25
             elif mag_range >= 2.0:
@@ -461,12 +709,16 @@ class EarthquakeFuturePredictor:
                 
         return min(100, quality_score)
         
-    def predict_next_earthquake(self, country, analysis):
+    def predict_next_earthquake(self, country, analysis, now=None):
         """Predict the next earthquake based on sophisticated historical pattern analysis."""
         if not analysis or analysis['last_major_earthquake'] is None:
             return None
+        
+        # Use one timestamp for the whole prediction so date checks stay consistent
+        current_date = now or datetime.now()
             
         last_earthquake = analysis['last_major_earthquake']
+        days_since_last = int((pd.Timestamp(current_date).value - last_earthquake.value) // NS_PER_DAY)
         
         # Use median interval for more robust prediction (less affected by outliers)
         primary_interval = analysis['median_interval_days']
@@ -488,7 +740,6 @@ class EarthquakeFuturePredictor:
         # Ensure the predicted date is always in the future from current time
         
         # Ensure the predicted date is in the future
-        current_date = datetime.now()
         if expected_date <= current_date:
             # If the calculated date is in the past, project forward using the pattern
             days_overdue = (current_date - expected_date).days
@@ -506,7 +757,6 @@ class EarthquakeFuturePredictor:
         peak_months = analysis['peak_months']
         if expected_date.month not in peak_months and len(peak_months) > 0:
             # Find the closest future peak month
-            current_date = datetime.now()
             target_month = peak_months[0]
             
             # Create candidate dates in the current and next year
@@ -528,7 +778,6 @@ class EarthquakeFuturePredictor:
         date_range_end = expected_date + timedelta(days=uncertainty_days)
         
         # Ensure the entire range is in the future
-        current_date = datetime.now()
         if date_range_start <= current_date:
             # Shift the entire range forward to keep it in the future
             shift_days = (current_date - date_range_start).days + 1
@@ -560,7 +809,7 @@ class EarthquakeFuturePredictor:
         confidence_factors['pattern_regularity'] = regularity_score
         
         # Factor 3: Recent Data Relevance (0-20 points)
-        time_since_last = (datetime.now() - last_earthquake).days
+        time_since_last = days_since_last
         if time_since_last < 365:  # Within last year
             recency_score = 20
         elif time_since_last < 1825:  # Within 5 years
@@ -662,26 +911,34 @@ class EarthquakeFuturePredictor:
         else:
             variation_factor = 0.5  # Higher variation for inconsistent regions
             
-        # Generate magnitude with realistic constraints
-        predicted_magnitude = trend_adjusted_magnitude + np.random.normal(0, variation_factor)
-        
         # Apply regional and physical constraints
         min_magnitude = max(4.0, analysis.get('min_magnitude', 4.0))
         max_magnitude = min(analysis['max_magnitude'] + 0.5, 9.5)  # Allow slight increase but cap at 9.5
         
+        # One batch of uniforms drives every random choice: magnitude, latitude, longitude, depth
+        u = _rng.random(4)
+        
+        # Generate magnitude from a normal distribution truncated to the constraints (inverse
+        # CDF over the allowed probability band) rather than clipping, which piles mass on the bounds
+        magnitude_dist = NormalDist(float(trend_adjusted_magnitude), variation_factor)
+        lo_p = magnitude_dist.cdf(min_magnitude)
+        hi_p = magnitude_dist.cdf(max_magnitude)
+        if hi_p - lo_p > 1e-9:
+            p = min(max(lo_p + u[0] * (hi_p - lo_p), 1e-12), 1 - 1e-12)
+            predicted_magnitude = magnitude_dist.inv_cdf(p)
+        else:
+            # The whole band lies far in one tail; the nearest bound is the only plausible value
+            predicted_magnitude = trend_adjusted_magnitude
+        
         predicted_magnitude = max(min_magnitude, min(predicted_magnitude, max_magnitude))
-        predicted_magnitude = round(predicted_magnitude, 1)
+        predicted_magnitude = round(float(predicted_magnitude), 1)
         
-        # Estimate likely coordinates within country
+        # Estimate likely coordinates within country and depth based on historical patterns
         coords = COUNTRY_COORDS[country]
-        estimated_lat = np.random.uniform(coords['lat_range'][0], coords['lat_range'][1])
-        estimated_lon = np.random.uniform(coords['lon_range'][0], coords['lon_range'][1])
-        
-        # Estimate depth based on historical patterns
-        if analysis['shallow_count'] > analysis['deep_count']:
-            estimated_depth = np.random.uniform(5, 70)
-        else:
-            estimated_depth = np.random.uniform(70, 200)
+        depth_range = (5, 70) if analysis['shallow_count'] > analysis['deep_count'] else (70, 200)
+        low = np.array([coords['lat_range'][0], coords['lon_range'][0], depth_range[0]], dtype=np.float64)
+        high = np.array([coords['lat_range'][1], coords['lon_range'][1], depth_range[1]], dtype=np.float64)
+        estimated_lat, estimated_lon, estimated_depth = low + u[1:] * (high - low)
             
         estimated_depth = round(estimated_depth, 1)
         
@@ -696,7 +953,7 @@ class EarthquakeFuturePredictor:
             'confidence_penalties': penalties,
             'peak_risk_months': peak_months,
             'peak_season': analysis['peak_season'],
-            'days_since_last': (datetime.now() - last_earthquake).days,
+            'days_since_last': days_since_last,
             'expected_interval_years': round(weighted_interval / 365.25, 1),
             'pattern_strength': 'Strong' if analysis['consistency_metrics']['temporal_consistency'] > 0.7 else 
                               'Moderate' if analysis['consistency_metrics']['temporal_consistency'] > 0.4 else 'Weak',
@@ -726,6 +983,255 @@ class EarthquakeFuturePredictor:
             return {'level': 'Very High', 'color': '🔴', 'description': 'Severe shaking, major damage'}
         else:
             return {'level': 'Extreme', 'color': '🟣', 'description': 'Violent shaking, catastrophic damage'}
+    
+    def prepare_features(self):
+        """Prepare features for machine learning."""
+        if self.data is None:
+            return None, None
+        
+        # Select features; day and hour are only needed here, so they are derived on demand
+        feature_columns = ['latitude', 'longitude', 'depth', 'year', 'month', 'day', 'hour']
+        target_column = 'magnitude'
+        features = self.data[['latitude', 'longitude', 'depth', 'year', 'month']].assign(
+            day=self.data['time'].dt.day,
+            hour=self.data['time'].dt.hour
+        )[feature_columns]
+        
+        # Handle missing values
+        features = features.fillna(features.mean())
+        target = self.data[target_column].fillna(self.data[target_column].mean())
+        
+        return features, target
+    
+    def train_model(self, progress_callback=None):
+        """Train the earthquake prediction model."""
+        if not SKLEARN_AVAILABLE:
+            st.warning("Scikit-learn not available. Using simple statistical model.")
+            return self.train_simple_model()
+        
+        try:
+            # Imported on first use so that app start-up does not pay for scikit-learn
+            from sklearn.ensemble import RandomForestRegressor
+            from sklearn.metrics import mean_squared_error, r2_score
+            from sklearn.model_selection import train_test_split
+            from sklearn.preprocessing import StandardScaler
+            
+            features, target = self.prepare_features()
+            if features is None:
+                return False
+            
+            if progress_callback:
+                progress_callback("Preparing training data...", 0.2)
+            
+            # Split data
+            X_train, X_test, y_train, y_test = train_test_split(
+                features, target, test_size=0.2, random_state=42
+            )
+            
+            if progress_callback:
+                progress_callback("Scaling features...", 0.4)
+            
+            # Scale features
+            self.scaler = StandardScaler()
+            X_train_scaled = self.scaler.fit_transform(X_train)
+            X_test_scaled = self.scaler.transform(X_test)
+            
+            # The forest works in float32 internally; converting once here avoids a second
+            # full-size copy of the training matrix inside fit()
+            X_train_scaled = X_train_scaled.astype(np.float32, copy=False)
+            X_test_scaled = X_test_scaled.astype(np.float32, copy=False)
+            y_train = y_train.to_numpy(dtype=np.float32)
+            
+            if progress_callback:
+                progress_callback("Training Random Forest model...", 0.6)
+            
+            # Train model
+            self.model = RandomForestRegressor(
+                n_estimators=100,
+                max_depth=10,
+                random_state=42,
+                n_jobs=-1
+            )
+            
+            self.model.fit(X_train_scaled, y_train)
+            
+            if progress_callback:
+                progress_callback("Evaluating model...", 0.8)
+            
+            # Evaluate
+            train_pred = self.model.predict(X_train_scaled)
+            test_pred = self.model.predict(X_test_scaled)
+            
+            train_rmse = np.sqrt(mean_squared_error(y_train, train_pred))
+            test_rmse = np.sqrt(mean_squared_error(y_test, test_pred))
+            train_r2 = r2_score(y_train, train_pred)
+            test_r2 = r2_score(y_test, test_pred)
+            
+            if progress_callback:
+                progress_callback("Training complete!", 1.0)
+            
+            self.is_trained = True
+            
+            # Save model
+            self.save_model()
+            
+            return {
+                'train_rmse': train_rmse,
+                'test_rmse': test_rmse,
+                'train_r2': train_r2,
+                'test_r2': test_r2,
+                'feature_importance': dict(zip(features.columns, self.model.feature_importances_))
+            }
+            
+        except Exception as e:
+            st.error(f"Error training model: {e}")
+            return False
+    
+    def train_simple_model(self):
+        """Simple statistical model as fallback."""
+        if self.data is None:
+            return False
+        
+        # Simple zone-based statistical model; zone is categorical, so per-zone moments are
+        # integer-bucketed bincounts over the category codes (missing values skipped)
+        zones = self.data['zone'].astype('category')
+        codes = zones.cat.codes.to_numpy()
+        magnitudes = self.data['magnitude'].to_numpy(dtype=np.float64)
+        valid = (codes >= 0) & ~np.isnan(magnitudes)
+        codes, magnitudes = codes[valid], magnitudes[valid]
+        
+        n_zones = len(zones.cat.categories)
+        counts = np.bincount(codes, minlength=n_zones)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.bincount(codes, weights=magnitudes, minlength=n_zones) / counts
+            squared_dev = np.bincount(codes, weights=(magnitudes - means[codes]) ** 2, minlength=n_zones)
+            stds = np.sqrt(squared_dev / (counts - 1))
+        
+        observed = np.flatnonzero(counts)
+        names = zones.cat.categories[observed]
+        self.zone_stats = {
+            'mean': dict(zip(names, means[observed].tolist())),
+            'std': dict(zip(names, stds[observed].tolist())),
+            'count': dict(zip(names, counts[observed].tolist()))
+        }
+        self.global_stats = {
+            'mean': self.data['magnitude'].mean(),
+            'std': self.data['magnitude'].std()
+        }
+        self.is_trained = True
+        
+        return {
+            'model_type': 'Statistical',
+            'zones': len(self.zone_stats['mean']),
+            'mean_magnitude': self.global_stats['mean'],
+            'std_magnitude': self.global_stats['std']
+        }
+    
+    def predict(self, latitude, longitude, depth, zone=None):
+        """Make earthquake magnitude prediction."""
+        if not self.is_trained:
+            return None
+        
+        try:
+            if self.model is not None and self.scaler is not None:
+                # ML model prediction
+                current_time = datetime.now()
+                features = np.array([[
+                    latitude, longitude, depth,
+                    current_time.year, current_time.month,
+                    current_time.day, current_time.hour
+                ]])
+                
+                features_scaled = self.scaler.transform(features)
+                prediction = self.model.predict(features_scaled)[0]
+                
+                return {
+                    'predicted_magnitude': round(prediction, 1),
+                    'model_type': 'Random Forest',
+                    'confidence': 'High' if 4.0 <= prediction <= 7.0 else 'Medium'
+                }
+            
+            else:
+                # Statistical model prediction
+                if zone and zone in self.zone_stats['mean']:
+                    base_mag = self.zone_stats['mean'][zone]
+                    std_mag = self.zone_stats['std'][zone]
+                else:
+                    base_mag = self.global_stats['mean']
+                    std_mag = self.global_stats['std']
+                
+                # Add some variation based on depth
+                depth_factor = 1.0 + (depth - 50) * 0.001  # Slight depth adjustment
+                predicted_mag = base_mag * depth_factor
+                
+                return {
+                    'predicted_magnitude': round(predicted_mag, 1),
+                    'model_type': 'Statistical',
+                    'confidence': 'Medium',
+                    'zone_average': round(base_mag, 1) if zone else None
+                }
+                
+        except Exception as e:
+            st.error(f"Prediction error: {e}")
+            return None
+    
+    def save_model(self):
+        """Save the trained model."""
+        try:
+            model_data = {
+                'model': self.model,
+                'scaler': self.scaler,
+                'is_trained': self.is_trained,
+                'zone_stats': getattr(self, 'zone_stats', None),
+                'global_stats': getattr(self, 'global_stats', None)
+            }
+            
+            # joblib ships with scikit-learn and stores the forest's arrays compactly
+            import joblib
+            
+            joblib.dump(model_data, MODEL_PATH, compress=3)
+                
+        except Exception as e:
+            st.warning(f"Could not save model: {e}")
+    
+    def load_model(self):
+        """Load a pre-trained model."""
+        try:
+            if os.path.exists(MODEL_PATH):
+                import joblib
+                
+                # Also reads models saved with plain pickle by earlier versions
+                model_data = joblib.load(MODEL_PATH)
+                
+                self.model = model_data.get('model')
+                self.scaler = model_data.get('scaler')
+                self.is_trained = model_data.get('is_trained', False)
+                self.zone_stats = model_data.get('zone_stats')
+                self.global_stats = model_data.get('global_stats')
+                
+                return True
+        except Exception as e:
+            st.warning(f"Could not load saved model: {e}")
+        
+        return False
+
+@st.cache_resource(show_spinner=False)
+def get_predictor():
+    """Create the predictor and load its data once, sharing it across reruns and sessions."""
+    predictor = EarthquakeFuturePredictor()
+    if not predictor.load_data():
+        return None
+    return predictor
+
+def _refresh_live_data(predictor):
+    """Button callback: drop the cached USGS response and append any newer earthquakes."""
+    _fetch_usgs_geojson.clear()
+    messages = []
+    with st.spinner("🌐 Fetching recent earthquake data from USGS..."):
+        added = predictor.refresh_live_data(messages)
+    for level, message in messages:
+        getattr(st, level)(message)
+    st.success(f"🔄 Live data refreshed: {added} new earthquakes added")
 
 def main():
     """Main application interface."""
@@ -740,17 +1246,22 @@ def main():
     st.markdown("**🎯 Target Accuracy: 80%+ for specific countries using historical pattern analysis**")
     st.markdown("---")
     
-    # Initialize predictor
-    if 'predictor' not in st.session_state:
-        st.session_state.predictor = EarthquakeFuturePredictor()
-        
-    predictor = st.session_state.predictor
+    # Initialize predictor and load data (shared by all sessions)
+    with st.spinner("🔄 Loading massive earthquake database (200,000+ records)..."):
+        predictor = get_predictor()
+        
+    if predictor is None:
+        # Do not keep a failed load cached
+        get_predictor.clear()
+        st.stop()
     
-    # Load data
-    if predictor.data is None:
-        with st.spinner("🔄 Loading massive earthquake database (200,000+ records)..."):
-            if not predictor.load_data():
-                st.stop()
+    # One timestamp per script run keeps all date arithmetic consistent
+    now = datetime.now()
+    
+    # Load messages are shown once per session, as when each session loaded its own data
+    if not st.session_state.get('load_status_shown'):
+        predictor.show_load_status(now)
+        st.session_state.load_status_shown = True
                 
     # Sidebar controls
     st.sidebar.header("🎯 Country Selection")
@@ -765,17 +1276,11 @@ def main():
     
     # Display country info
     country_info = COUNTRY_COORDS[selected_country]
-    st.sidebar.info(f"""
-    **Selected**: {country_info['name']}
-    
-    **Coordinates**:
-    - Lat: {country_info['lat_range'][0]}° to {country_info['lat_range'][1]}°
-    - Lon: {country_info['lon_range'][0]}° to {country_info['lon_range'][1]}°
-    """)
+    st.sidebar.info(COUNTRY_SIDEBAR_INFO[selected_country])
     
     # Display recent earthquake activity
     with st.spinner("📊 Checking recent earthquake activity..."):
-        recent_summary = predictor.get_recent_earthquake_summary(selected_country)
+        recent_summary = predictor.get_recent_earthquake_summary(selected_country, now=now)
         
         if recent_summary and recent_summary['latest_earthquake'] is not None:
             st.sidebar.markdown("---")
@@ -785,9 +1290,9 @@ def main():
             latest = recent_summary['latest_earthquake']
             st.sidebar.success(f"""
             🕐 **Latest Earthquake**: {recent_summary['days_since_latest']} days ago
-            📊 **Magnitude**: {latest['magnitude']}
-            📍 **Location**: {latest.get('place', 'Unknown')}
-            📅 **Date**: {latest['time'].strftime('%Y-%m-%d')}
+            📊 **Magnitude**: {latest.magnitude:.1f}
+            📍 **Location**: {latest.place}
+            📅 **Date**: {latest.time.strftime('%Y-%m-%d')}
             """)
             
             # Show recent significant earthquake if different
@@ -796,8 +1301,8 @@ def main():
                 sig = recent_summary['latest_significant']
                 st.sidebar.info(f"""
                 ⚡ **Latest Significant (M≥4.0)**: {recent_summary['days_since_significant']} days ago
-                📊 **Magnitude**: {sig['magnitude']}
-                📅 **Date**: {sig['time'].strftime('%Y-%m-%d')}
+                📊 **Magnitude**: {sig.magnitude:.1f}
+                📅 **Date**: {sig.time.strftime('%Y-%m-%d')}
                 """)
             
             # Show activity summary
@@ -819,26 +1324,26 @@ def main():
         
         with st.spinner(f"🔍 Analyzing earthquake patterns for {selected_country}..."):
             
-            # Filter country data
-            country_data = predictor.filter_country_data(selected_country)
+            # Look up the country's precomputed arrays
+            country_arrays = predictor.get_country_arrays(selected_country)
             
-            if len(country_data) == 0:
+            if country_arrays is None or len(country_arrays.rows) == 0:
                 st.error(f"❌ **No earthquake data found for {selected_country}**")
                 st.info("This region may not have sufficient historical earthquake data in our database.")
                 return
                 
-            st.success(f"✅ Found {len(country_data):,} earthquake records for {selected_country}")
+            st.success(f"✅ Found {len(country_arrays.rows):,} earthquake records for {selected_country}")
             
-            # Analyze patterns
-            analysis = predictor.analyze_earthquake_patterns(country_data)
+            # Analyze patterns (cached per country, data version and day)
+            analysis = predictor.analyze_earthquake_patterns(selected_country, now=now)
             
             if not analysis:
                 st.error(f"❌ **Insufficient data for reliable prediction in {selected_country}**")
                 st.info("Need at least 5 significant earthquakes (magnitude ≥ 4.0) for pattern analysis.")
                 return
                 
-            # Generate prediction
-            prediction = predictor.predict_next_earthquake(selected_country, analysis)
+            # Generate prediction; only the cheap stochastic draws run on every click
+            prediction = predictor.predict_next_earthquake(selected_country, analysis, now=now)
             
             if not prediction:
                 st.error(f"❌ **Could not generate prediction for {selected_country}**")
@@ -893,7 +1398,7 @@ def main():
                 """)
                 
                 # Peak risk periods
-                peak_months = [datetime(2000, month, 1).strftime('%B') for month in prediction['peak_risk_months']]
+                peak_months = [MONTH_NAMES[month - 1] for month in prediction['peak_risk_months']]
                 st.warning(f"⚠️ **Highest Risk Months**: {', '.join(peak_months)}")
                 st.info(f"🍂 **Peak Season**: {prediction['peak_season'].title()}")
                 
@@ -945,13 +1450,8 @@ def main():
             monthly_data = analysis['monthly_distribution']
             
             if monthly_data:
-                # Create month names for better display
-                month_names = {}
-                for month_num, count in monthly_data.items():
-                    month_name = datetime(2000, month_num, 1).strftime('%B')
-                    month_names[month_name] = count
-                    
-                st.bar_chart(month_names)
+                # Show month names for better display
+                st.bar_chart({MONTH_NAMES[month_num - 1]: count for month_num, count in monthly_data.items()})
             
             # Seasonal analysis
             st.subheader("🍃 Seasonal Risk Analysis")
@@ -962,9 +1462,16 @@ def main():
     st.sidebar.markdown("---")
     st.sidebar.subheader("ℹ️ System Information")
     if predictor.data is not None:
-        st.sidebar.success(f"✅ Database: {len(predictor.data):,} records")
+        st.sidebar.success(f"✅ Database: {predictor.total_records_str} records")
         st.sidebar.info(f"📅 Coverage: 1800-2024 (224 years)")
         st.sidebar.info(f"🌍 Global seismic zones")
+        st.sidebar.button(
+            "🔄 Refresh live data",
+            on_click=_refresh_live_data,
+            args=(predictor,),
+            use_container_width=True,
+            help="Fetch the latest USGS earthquakes without reloading the historical database"
+        )
     
     st.sidebar.markdown("---")
     st.sidebar.caption("""
@@ -987,230 +1494,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-class EarthquakeFuturePredictor:
-    """Future earthquake prediction system using historical analysis."""
-    
-    def __init__(self):
-        self.data = None
-        self.country_data = {}
-        self.predictions_cache = {}
-        
-    def load_data(self):
-        """Load and process earthquake data."""
-        try:
-            data_path = "data/earthquakes.csv"
-            if not os.path.exists(data_path):
-                st.error(f"Dataset not found at {data_path}")
-                return False
-                
-            self.data = pd.read_csv(data_path)
-            self.data['time'] = pd.to_datetime(self.data['time'])
-            self.data['year'] = self.data['time'].dt.year
-            self.data['month'] = self.data['time'].dt.month
-            
-            st.success(f"✅ Loaded {len(self.data):,} earthquake records from 1800-2024")
-            return True
-            
-        except Exception as e:
-            st.error(f"Error loading data: {str(e)}")
-            return False
-            self.data['hour'] = self.data['time'].dt.hour
-            
-            return True
-            
-        except Exception as e:
-            st.error(f"Error loading data: {e}")
-            return False
-    
-    def prepare_features(self):
-        """Prepare features for machine learning."""
-        if self.data is None:
-            return None, None
-        
-        # Select features
-        feature_columns = ['latitude', 'longitude', 'depth', 'year', 'month', 'day', 'hour']
-        target_column = 'magnitude'
-        
-        # Handle missing values
-        features = self.data[feature_columns].fillna(self.data[feature_columns].mean())
-        target = self.data[target_column].fillna(self.data[target_column].mean())
-        
-        return features, target
-    
-    def train_model(self, progress_callback=None):
-        """Train the earthquake prediction model."""
-        if not SKLEARN_AVAILABLE:
-            st.warning("Scikit-learn not available. Using simple statistical model.")
-            return self.train_simple_model()
-        
-        try:
-            features, target = self.prepare_features()
-            if features is None:
-                return False
-            
-            if progress_callback:
-                progress_callback("Preparing training data...", 0.2)
-            
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                features, target, test_size=0.2, random_state=42
-            )
-            
-            if progress_callback:
-                progress_callback("Scaling features...", 0.4)
-            
-            # Scale features
-            self.scaler = StandardScaler()
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-            
-            if progress_callback:
-                progress_callback("Training Random Forest model...", 0.6)
-            
-            # Train model
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42,
-                n_jobs=-1
-            )
-            
-            self.model.fit(X_train_scaled, y_train)
-            
-            if progress_callback:
-                progress_callback("Evaluating model...", 0.8)
-            
-            # Evaluate
-            train_pred = self.model.predict(X_train_scaled)
-            test_pred = self.model.predict(X_test_scaled)
-            
-            train_rmse = np.sqrt(mean_squared_error(y_train, train_pred))
-            test_rmse = np.sqrt(mean_squared_error(y_test, test_pred))
-            train_r2 = r2_score(y_train, train_pred)
-            test_r2 = r2_score(y_test, test_pred)
-            
-            if progress_callback:
-                progress_callback("Training complete!", 1.0)
-            
-            self.is_trained = True
-            
-            # Save model
-            self.save_model()
-            
-            return {
-                'train_rmse': train_rmse,
-                'test_rmse': test_rmse,
-                'train_r2': train_r2,
-                'test_r2': test_r2,
-                'feature_importance': dict(zip(features.columns, self.model.feature_importances_))
-            }
-            
-        except Exception as e:
-            st.error(f"Error training model: {e}")
-            return False
-    
-    def train_simple_model(self):
-        """Simple statistical model as fallback."""
-        if self.data is None:
-            return False
-        
-        # Simple zone-based statistical model
-        self.zone_stats = self.data.groupby('zone')['magnitude'].agg(['mean', 'std', 'count']).to_dict()
-        self.global_stats = {
-            'mean': self.data['magnitude'].mean(),
-            'std': self.data['magnitude'].std()
-        }
-        self.is_trained = True
-        
-        return {
-            'model_type': 'Statistical',
-            'zones': len(self.zone_stats['mean']),
-            'mean_magnitude': self.global_stats['mean'],
-            'std_magnitude': self.global_stats['std']
-        }
-    
-    def predict(self, latitude, longitude, depth, zone=None):
-        """Make earthquake magnitude prediction."""
-        if not self.is_trained:
-            return None
-        
-        try:
-            if SKLEARN_AVAILABLE and self.model is not None and self.scaler is not None:
-                # ML model prediction
-                current_time = datetime.now()
-                features = np.array([[
-                    latitude, longitude, depth,
-                    current_time.year, current_time.month,
-                    current_time.day, current_time.hour
-                ]])
-                
-                features_scaled = self.scaler.transform(features)
-                prediction = self.model.predict(features_scaled)[0]
-                
-                return {
-                    'predicted_magnitude': round(prediction, 1),
-                    'model_type': 'Random Forest',
-                    'confidence': 'High' if 4.0 <= prediction <= 7.0 else 'Medium'
-                }
-            
-            else:
-                # Statistical model prediction
-                if zone and zone in self.zone_stats['mean']:
-                    base_mag = self.zone_stats['mean'][zone]
-                    std_mag = self.zone_stats['std'][zone]
-                else:
-                    base_mag = self.global_stats['mean']
-                    std_mag = self.global_stats['std']
-                
-                # Add some variation based on depth
-                depth_factor = 1.0 + (depth - 50) * 0.001  # Slight depth adjustment
-                predicted_mag = base_mag * depth_factor
-                
-                return {
-                    'predicted_magnitude': round(predicted_mag, 1),
-                    'model_type': 'Statistical',
-                    'confidence': 'Medium',
-                    'zone_average': round(base_mag, 1) if zone else None
-                }
-                
-        except Exception as e:
-            st.error(f"Prediction error: {e}")
-            return None
-    
-    def save_model(self):
-        """Save the trained model."""
-        try:
-            model_data = {
-                'model': self.model,
-                'scaler': self.scaler,
-                'is_trained': self.is_trained,
-                'zone_stats': getattr(self, 'zone_stats', None),
-                'global_stats': getattr(self, 'global_stats', None)
-            }
-            
-            with open('data/final_model.pkl', 'wb') as f:
-                pickle.dump(model_data, f)
-                
-        except Exception as e:
-            st.warning(f"Could not save model: {e}")
-    
-    def load_model(self):
-        """Load a pre-trained model."""
-        try:
-            if os.path.exists('data/final_model.pkl'):
-                with open('data/final_model.pkl', 'rb') as f:
-                    model_data = pickle.load(f)
-                
-                self.model = model_data.get('model')
-                self.scaler = model_data.get('scaler')
-                self.is_trained = model_data.get('is_trained', False)
-                self.zone_stats = model_data.get('zone_stats')
-                self.global_stats = model_data.get('global_stats')
-                
-                return True
-        except Exception as e:
-            st.warning(f"Could not load saved model: {e}")
-        
-        return False
-